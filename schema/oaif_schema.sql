@@ -851,6 +851,7 @@ CREATE TABLE extension_data (
 CREATE INDEX idx_account_account_type_id ON account(account_type_id);
 CREATE INDEX idx_account_parent_id ON account(parent_id);
 CREATE INDEX idx_account_is_active ON account(is_active);
+CREATE INDEX idx_account_active_code ON account(code) WHERE is_active = 1;
 
 CREATE INDEX idx_customer_name ON customer(name);
 CREATE INDEX idx_customer_is_active ON customer(is_active);
@@ -876,6 +877,7 @@ CREATE INDEX idx_txn_header_doc_number ON txn_header(doc_number);
 CREATE INDEX idx_txn_header_customer_id ON txn_header(customer_id);
 CREATE INDEX idx_txn_header_vendor_id ON txn_header(vendor_id);
 CREATE INDEX idx_txn_header_account_id ON txn_header(account_id);
+CREATE INDEX idx_txn_header_recent ON txn_header(txn_date DESC, id DESC) WHERE is_voided = 0;
 
 CREATE INDEX idx_txn_line_txn_header_id ON txn_line(txn_header_id);
 CREATE INDEX idx_txn_line_account_id ON txn_line(account_id);